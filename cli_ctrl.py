@@ -1,18 +1,87 @@
 # src/helloworld_click_client/cli_ctrl.py -> cli_ctrl.py
 import click
 import sys
-import json
+import select
 
 # Direct imports for sibling modules
+# Heavier siblings (sys_detect, cmd_run, resp_fmt, orchestrator_comm -> middleware/LLM SDKs)
+# are imported inside the functions that use them so `--help` stays fast.
 import cli_menu
-import sys_detect
-import cmd_run
-# Import specific functions directly from sibling modules
-from resp_fmt import extract_code_blocks, extract_command_text, format_code_blocks_for_display
-import orchestrator_comm
+
+# --- LLM Context Message Templates ---
+_SUCCESS_TMPL = (
+    "The following command executed successfully:\n"
+    "```\n%s\n```\n"
+    "Output (stdout):\n%s\n"
+    "Output (stderr):\n%s\n\n"
+    "Please provide the next command or instruction based on this result."
+)
+_ERROR_TMPL = (
+    "The following command failed:\n"
+    "```\n%s\n```\n"
+    "Exit Code: %s\n"
+    "Output (stdout):\n%s\n"
+    "Error Output (stderr):\n%s\n\n"
+    "Please provide corrected commands or troubleshooting steps."
+)
 
 # --- Helper Functions for Different Workflow States ---
 
+def _summarize_output(text, head=2000, tail=2000, snap=200):
+    """
+    Shortens long command output before it is sent back to the LLM.
+    Keeps the first `head` and last `tail` characters (errors usually show up at
+    the end). Each cut snaps to a line boundary only if one lies within `snap`
+    characters of it, so long lines cannot shrink the kept parts.
+
+    Returns:
+        str: The original text if short enough, otherwise head + elision marker + tail.
+    """
+    if not text or len(text) <= head + tail + 200:
+        return text
+
+    head_end = text.rfind("\n", max(0, head - snap), head)
+    if head_end <= 0:
+        head_end = head
+    tail_start = len(text) - tail
+    newline = text.find("\n", tail_start, tail_start + snap)
+    if newline != -1:
+        tail_start = newline + 1 # Start the tail on a fresh line
+
+    elided = tail_start - head_end
+    return f"{text[:head_end]}\n...[{elided} chars elided]...\n{text[tail_start:]}"
+
+def _read_user_input(prompt_text, max_chars=256, idle_timeout=0.01):
+    """
+    Reads a line from stdin, plus any further lines that arrive within
+    `idle_timeout` seconds of each other (a multi-line paste), up to `max_chars`.
+    Pastes are only gathered from a terminal; piped stdin is read one line at a time.
+
+    Returns:
+        str: The collected input stripped of surrounding whitespace ('' on EOF).
+    """
+    click.echo(f"{prompt_text}: ", nl=False, err=True) # Prompt on stderr for visibility
+    line = sys.stdin.readline()
+    # select() sees the file descriptor, not sys.stdin's own buffer. A terminal hands
+    # over one line per read so nothing hides there, but piped input arrives in chunks:
+    # select() would miss lines already buffered, or swallow the answer meant for the
+    # next prompt. select() also only works on sockets on Windows.
+    if sys.platform == 'win32' or not sys.stdin.isatty():
+        return line.strip()
+    lines = [line]
+    total = len(line)
+    while line and total < max_chars:
+        try:
+            ready, _, _ = select.select([sys.stdin], [], [], idle_timeout)
+        except (OSError, ValueError):
+            break # stdin is not selectable (e.g. replaced in tests)
+        if not ready:
+            break
+        line = sys.stdin.readline()
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).strip()
+
 def _handle_no_code_blocks():
     """
     Handles the workflow path when the LLM response contains no code blocks.
@@ -21,10 +90,7 @@ def _handle_no_code_blocks():
     Returns:
         Tuple[str | None, str | None, bool]: (next_mode, next_message, exit_flag)
     """
-    user_input = click.prompt(
-        "How can I help further? (Max 256 chars, press Enter to exit)",
-        default="", show_default=False, err=True # Prompt on stderr for visibility
-    )
+    user_input = _read_user_input("How can I help further? (Max 256 chars, press Enter to exit)")
     if not user_input:
         return None, None, True # mode, message, exit_flag=True
     else:
@@ -46,6 +112,9 @@ def _handle_command_confirmation(code_block):
     Returns:
         Tuple[str | None, str | None, bool]: (next_mode, next_message, exit_flag)
     """
+    import cmd_run
+    from resp_fmt import extract_command_text
+
     command_text = extract_command_text(code_block)
     if not command_text:
          click.secho("Warning: Could not extract command text from code block.", fg='yellow', err=True)
@@ -81,19 +150,12 @@ def _handle_command_success(stdout, stderr, executed_command):
     Returns:
         Tuple[str, str, bool]: ('execute', success_message, False)
     """
+    # Output was already streamed to the console by cmd_run, so only report the status
     click.secho("Command executed successfully.", fg='green')
-    # Display output clearly
-    if stdout: click.echo(f"\n--- Output stdout ---\n{stdout}\n---------------------")
-    if stderr: click.echo(f"\n--- Output stderr ---\n{stderr}\n---------------------") # Show stderr even on success
-
-    # Prepare context message for the next LLM call
-    next_message = (
-        f"The following command executed successfully:\n"
-        f"```\n{executed_command}\n```\n"
-        f"Output (stdout):\n{stdout or '[No stdout]'}\n"
-        f"Output (stderr):\n{stderr or '[No stderr]'}\n\n"
-        f"Please provide the next command or instruction based on this result."
-    )
+
+    # Prepare context message for the next LLM call (bounded in size)
+    stdout, stderr = _summarize_output(stdout), _summarize_output(stderr)
+    next_message = _SUCCESS_TMPL % (executed_command, stdout or '[No stdout]', stderr or '[No stderr]')
     next_mode = 'execute'
     return next_mode, next_message, False # exit_flag=False
 
@@ -104,19 +166,12 @@ def _handle_command_error(stdout, stderr, returncode, executed_command):
     Returns:
         Tuple[str, str, bool]: ('fix', error_message, False)
     """
+    # Output was already streamed to the console by cmd_run, so only report the status
     click.secho(f"Command failed (Exit Code: {returncode}).", fg='red', err=True)
-    if stdout: click.echo(f"\n--- Output stdout ---\n{stdout}\n---------------------")
-    if stderr: click.echo(f"\n--- Error Output stderr ---\n{stderr}\n-------------------------")
-
-    # Prepare context message for the next LLM call ('fix' mode)
-    next_message = (
-        f"The following command failed:\n"
-        f"```\n{executed_command}\n```\n"
-        f"Exit Code: {returncode}\n"
-        f"Output (stdout):\n{stdout or '[No stdout]'}\n"
-        f"Error Output (stderr):\n{stderr or '[No stderr]'}\n\n"
-        f"Please provide corrected commands or troubleshooting steps."
-    )
+
+    # Prepare context message for the next LLM call ('fix' mode, bounded in size)
+    stdout, stderr = _summarize_output(stdout), _summarize_output(stderr)
+    next_message = _ERROR_TMPL % (executed_command, returncode, stdout or '[No stdout]', stderr or '[No stderr]')
     next_mode = 'fix'
     return next_mode, next_message, False # exit_flag=False
 
@@ -127,12 +182,17 @@ def _handle_command_error(stdout, stderr, returncode, executed_command):
 def cli_entry_point():
     """Helloworld Click Client - Your AI-Powered Ops Assistant"""
     click.echo("Welcome! Starting system detection...")
+    # Deferred imports, see top of module
+    import sys_detect
+    from resp_fmt import extract_code_blocks, format_code_blocks_for_display
+    import orchestrator_comm
 
     # 1. System Detection
     try:
+        # Cached in-process and on disk by sys_detect
         system_info_dict = sys_detect.get_system_info()
-        # Ensure JSON is compact for sending, pretty print only if debugging
-        system_info_json = json.dumps(system_info_dict)
+        # Compact JSON for sending (orjson when available), serialized once by sys_detect
+        system_info_json = sys_detect.get_system_info_json()
         click.echo("System detection complete.")
         # Display minimal info to user
         click.echo(f"OS: {system_info_dict.get('os_info', {}).get('system', 'N/A')}")
@@ -140,6 +200,8 @@ def cli_entry_point():
         click.secho(f"Error during system detection: {e}", fg='red', err=True)
         # Send empty JSON, middleware should handle potentially missing info
         system_info_json = "{}"
+    # Wrap the system info once; the same header is sent on every turn
+    system_info_header = orchestrator_comm.build_system_info_header(system_info_json)
 
     # 2. Display Menu and Get Use Case
     selected_product, selected_operation = cli_menu.display_and_select_use_case()
@@ -163,7 +225,7 @@ def cli_entry_point():
             operation=selected_operation,
             mode=current_mode,
             msg=user_message,
-            system_info_json=system_info_json
+            system_info_header=system_info_header
         )
 
         # Handle communication failure
@@ -176,7 +238,7 @@ def cli_entry_point():
         # Display formatted output (might just be text or include formatted blocks)
         display_output = format_code_blocks_for_display(code_blocks, llm_response)
         click.echo("\n--- Orchestrator Response ---")
-        click.echo(display_output.strip()) # Print the formatted/raw response
+        click.echo(display_output) # Print the formatted/raw response (already stripped)
         click.echo("---------------------------\n")
 
         # 5. Decide Next Step based on Code Blocks
@@ -13,6 +13,9 @@ USE_CASES = {
     # Add more use cases here
 }
 
+# Valid menu inputs (use case keys plus '0' to exit), built once at import
+_CHOICES = click.Choice(list(USE_CASES.keys()) + ['0'])
+
 def display_and_select_use_case():
     """Displays the menu and returns the selected (product, operation) tuple."""
     click.echo("\nPlease select a use case:")
@@ -21,7 +24,7 @@ def display_and_select_use_case():
     click.echo("  0. Exit")
 
     while True:
-        choice = click.prompt("Enter your choice", type=click.Choice(list(USE_CASES.keys()) + ['0']))
+        choice = click.prompt("Enter your choice", type=_CHOICES)
 
         if choice == '0':
             return None, None # Indicate user chose to exit
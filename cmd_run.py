@@ -5,6 +5,138 @@ Provides a reusable helper function for running shell commands reliably.
 import subprocess
 import shlex
 import sys
+import re
+import functools
+import io
+import os
+import codecs
+import locale
+import selectors
+import shutil
+
+_READ_CHUNK_SIZE = 65536
+
+# Shell features (pipes, globs, redirects, variables, chaining) that are NOT
+# interpreted since commands run without a shell; one C-level scan per command.
+_SHELL_META_CHARS = '|*><$&'
+_SHELL_META = re.compile(f"[{re.escape(_SHELL_META_CHARS)}]")
+
+# Wider set that keeps a command off the posix_spawn fast path (no warning);
+# built on _SHELL_META_CHARS so anything that warns also skips the fast path.
+_SPAWN_UNSAFE = re.compile(f"[{re.escape(_SHELL_META_CHARS + ';()`?[]{}~')}]")
+
+@functools.lru_cache(maxsize=64)
+def _parse_args(command_str: str):
+    """Splits a command string with shlex; cached since the LLM often repeats commands."""
+    return tuple(shlex.split(command_str))
+
+def _stream_output(stdout_pipe, stderr_pipe):
+    """
+    Echoes a running process's stdout/stderr as it arrives while collecting it.
+
+    Pipes are read in raw chunks via a selector, so a partial line on one pipe
+    can never block draining the other. Both pipes are closed on EOF.
+    If the last echoed chunk did not end with a newline, one is added so later
+    messages start on a fresh line.
+
+    The console gets the raw text (so '\r' progress bars redraw in place), while
+    the collected text has '\r\n' and '\r' translated to '\n' as text=True would.
+
+    Returns:
+        A tuple of (stdout: str, stderr: str) with everything the process wrote.
+    """
+    encoding = locale.getpreferredencoding(False)
+    out_buf, err_buf = io.StringIO(), io.StringIO()
+    selector = selectors.DefaultSelector()
+    selector.register(stdout_pipe, selectors.EVENT_READ, (out_buf, sys.stdout))
+    selector.register(stderr_pipe, selectors.EVENT_READ, (err_buf, sys.stderr))
+    decoders = {
+        pipe: (codecs.getincrementaldecoder(encoding)(errors='replace'),
+               io.IncrementalNewlineDecoder(None, translate=True))
+        for pipe in (stdout_pipe, stderr_pipe)
+    }
+    last_text, last_console = "\n", sys.stdout
+    try:
+        while selector.get_map():
+            for key, _ in selector.select():
+                buf, console = key.data
+                data = os.read(key.fd, _READ_CHUNK_SIZE)
+                final = not data
+                decoder, newlines = decoders[key.fileobj]
+                text = decoder.decode(data, final=final)
+                # A trailing '\r' is held back until the next chunk shows whether '\n' follows
+                buf.write(newlines.decode(text, final=final))
+                if text:
+                    print(text, end='', file=console, flush=True)
+                    last_text, last_console = text, console
+                if final:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+    finally:
+        selector.close()
+    if not last_text.endswith("\n"):
+        print(file=last_console, flush=True)
+    return out_buf.getvalue(), err_buf.getvalue()
+
+def _communicate_output(proc: subprocess.Popen):
+    """
+    Windows fallback for _stream_output: selectors only support sockets there,
+    so the output is collected with communicate() and echoed once the process exits.
+    Newlines in the returned text are translated to '\n' as in _stream_output.
+    """
+    encoding = locale.getpreferredencoding(False)
+    out_bytes, err_bytes = proc.communicate()
+    stdout = out_bytes.decode(encoding, errors='replace')
+    stderr = err_bytes.decode(encoding, errors='replace')
+    # Terminate unfinished last lines so later messages start on a fresh line
+    if stdout: print(stdout, end='' if stdout.endswith('\n') else '\n', flush=True)
+    if stderr: print(stderr, end='' if stderr.endswith('\n') else '\n', file=sys.stderr, flush=True)
+    stdout = io.IncrementalNewlineDecoder(None, translate=True).decode(stdout, final=True)
+    stderr = io.IncrementalNewlineDecoder(None, translate=True).decode(stderr, final=True)
+    return stdout, stderr
+
+def _resolve_spawnable(command_str: str, args: list):
+    """
+    Returns the executable path if the command can take the posix_spawn fast path:
+    the platform supports it, the string has no shell metacharacters and args[0]
+    is an absolute path or resolvable on PATH. Returns None otherwise.
+    """
+    if not hasattr(os, 'posix_spawn'):
+        return None
+    if _SPAWN_UNSAFE.search(command_str):
+        return None
+    if os.path.isabs(args[0]):
+        return args[0] if os.access(args[0], os.X_OK) else None
+    return shutil.which(args[0])
+
+def _spawn_command(executable: str, args: list):
+    """
+    Runs args via os.posix_spawn with stdout/stderr redirected to pipes, skipping
+    the fork_exec plumbing of subprocess for short commands.
+
+    Returns:
+        A tuple of (stdout: str, stderr: str, returncode: int).
+    """
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    try:
+        pid = os.posix_spawn(executable, args, os.environ, file_actions=[
+            (os.POSIX_SPAWN_DUP2, out_w, 1),
+            (os.POSIX_SPAWN_DUP2, err_w, 2),
+        ])
+    except BaseException:
+        os.close(out_r)
+        os.close(err_r)
+        raise
+    finally:
+        # The child holds its own copies; close ours so EOF is seen on exit
+        os.close(out_w)
+        os.close(err_w)
+
+    with open(out_r, 'rb', buffering=0) as out_pipe, open(err_r, 'rb', buffering=0) as err_pipe:
+        stdout, stderr = _stream_output(out_pipe, err_pipe)
+    _, status = os.waitpid(pid, 0)
+    return stdout, stderr, os.waitstatus_to_exitcode(status)
 
 def run_command(command_str: str):
     """
@@ -23,7 +155,7 @@ def run_command(command_str: str):
         # might ever come from less trusted sources (like LLM output without validation).
         # If commands are always constructed internally, using a list is safer:
         # args = ['ls', '-l'] etc.
-        args = shlex.split(command_str)
+        args = list(_parse_args(command_str))
 
         if not args:
             print("Warning: Empty command string provided.", file=sys.stderr)
@@ -34,20 +166,32 @@ def run_command(command_str: str):
         # like pipes, wildcards, environment variable expansion *within the command string itself*.
         # If you need pipes etc., consider using multiple subprocess calls in Python.
         use_shell = False
-        # Example check (adapt as needed, but prefer avoiding shell=True):
-        # if any(c in command_str for c in ['|', '*', '>', '<', '$', '&&', '||']):
-        #    print("Warning: Command may use shell features. Consider alternative approaches.", file=sys.stderr)
-        #    # use_shell = True # Uncomment ONLY if absolutely necessary and understand risks
+        if _SHELL_META.search(command_str):
+            print("Warning: Command may use shell features. Consider alternative approaches.", file=sys.stderr)
+            # use_shell = True # Uncomment ONLY if absolutely necessary and understand risks
+
+        # Fast path: plain commands are started directly with posix_spawn
+        executable = None if use_shell else _resolve_spawnable(command_str, args)
+        if executable:
+            stdout, stderr, returncode = _spawn_command(executable, args)
+            print(f"Command finished with exit code: {returncode}")
+            return stdout.strip(), stderr.strip(), returncode
 
-        result = subprocess.run(
+        # Stream output to the console as it is produced instead of buffering
+        # everything until the process exits (long installs would look frozen).
+        proc = subprocess.Popen(
             args if not use_shell else command_str, # Pass string if shell=True
-            capture_output=True,
-            text=True,    # Capture output as text (decodes based on system default)
-            check=False,  # Do not raise exception on non-zero exit code
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             shell=use_shell # DANGEROUS if command_str comes from external input
         )
-        print(f"Command finished with exit code: {result.returncode}")
-        return result.stdout.strip(), result.stderr.strip(), result.returncode
+        if sys.platform == 'win32':
+            stdout, stderr = _communicate_output(proc)
+        else:
+            stdout, stderr = _stream_output(proc.stdout, proc.stderr)
+        returncode = proc.wait()
+        print(f"Command finished with exit code: {returncode}")
+        return stdout.strip(), stderr.strip(), returncode
 
     except FileNotFoundError:
         err_msg = f"Error: Command not found: '{args[0]}'. Is it installed and in PATH?"
@@ -14,9 +14,9 @@ _middleware_func: Optional[Callable] = None # Initialize function holder
 
 # Add middleware path to sys.path if not already present
 if _MIDDLEWARE_DIR_PATH not in sys.path:
-    # Using append worked, stick with it for simplicity unless conflicts arise
+    # Prepend so the middleware's own imports resolve without walking the whole sys.path first
     print(f"Info: Adding middleware path to sys.path: {_MIDDLEWARE_DIR_PATH}", file=sys.stderr)
-    sys.path.append(_MIDDLEWARE_DIR_PATH)
+    sys.path.insert(0, _MIDDLEWARE_DIR_PATH)
 
 try:
     # Try importing the specific function directly
@@ -39,36 +39,49 @@ except Exception as e:
 
 
 # --- Communication Function ---
+def build_system_info_header(system_info_json: Optional[str]) -> str:
+    """
+    Wraps the system info JSON in the fenced header prepended to every message.
+    Build it once per session and pass it to call_llm_workflow on each turn.
+    Returns an empty string when there is no usable system info.
+    """
+    if not system_info_json or system_info_json == "{}":
+        return ""
+    return f"System Information:\n```json\n{system_info_json}\n```\n---"
+
 def call_llm_workflow(
     product: str,
     operation: str,
     mode: str,
     msg: Optional[str] = None,
-    system_info_json: Optional[str] = None
+    system_info_header: Optional[str] = None,
+    _fn: Optional[Callable] = _middleware_func
 ) -> Optional[str]:
     """
     Calls the dynamically imported handle_request function from the middleware.
+    system_info_header is the precomputed output of build_system_info_header().
+    _fn is bound to the middleware function at import time (a local lookup per call).
     """
-    if _middleware_func is None:
+    if _fn is None:
         print("Error: Middleware function 'handle_request' could not be loaded. Cannot communicate.", file=sys.stderr)
         return None
 
     # --- Prepare Message Payload ---
-    final_message = ""
-    if system_info_json and system_info_json != "{}":
-        final_message += f"System Information:\n```json\n{system_info_json}\n```\n---"
+    # Collect the pieces and join once instead of repeated string concatenation
+    parts = []
+    if system_info_header:
+        parts.append(system_info_header)
     if msg:
-        if final_message:
-            final_message += "\nUser Context/Message:\n"
-        final_message += msg
-    elif not final_message:
-        # Use a default message if both system_info and msg are empty/None
-        final_message = "Initial request."
+        if parts:
+            parts.append("\nUser Context/Message:\n")
+        parts.append(msg)
+    # Use a default message if both system_info and msg are empty/None
+    final_message = "".join(parts) or "Initial request."
 
     try:
         # Directly call the dynamically loaded function object.
         # Ensure the arguments match what handle_request expects.
-        response = _middleware_func(
+        response = _fn(
             product=product,
             operation=operation,
             target='local', # Still assuming 'local' target, adjust if needed
@@ -5,6 +5,52 @@ Handles formatting LLM responses, focusing on extracting code blocks.
 import re
 from typing import List
 
+_FENCE = "```"
+
+# Fallback for blocks whose opening fence is not followed by a newline (e.g. ```ls -l```)
+_TRIPLE_TICK_CMD_RE = re.compile(r"```(?:[\w-]+)?\s*?\n?(.*?)\n?\s*?```", re.DOTALL)
+# Fallback for inline commands wrapped in single backticks
+_SINGLE_TICK_RE = re.compile(r"`([^`]+)`")
+
+def _scan_fences(text: str) -> list[tuple[int, int, int, int]]:
+    """
+    Scans text once for triple-backtick fenced blocks.
+
+    An opening fence is ``` followed by an optional language identifier
+    (letters, digits, '_' or '-'), optional whitespace and a newline.
+    The block ends at the next ```; trailing whitespace is excluded from the body.
+
+    Returns:
+        A list of (open_start, body_start, body_end, close_end) index tuples.
+    """
+    fences = []
+    length = len(text)
+    pos = text.find(_FENCE)
+    while pos != -1:
+        # Skip the optional language identifier
+        i = pos + 3
+        while i < length and (text[i].isalnum() or text[i] in "_-"):
+            i += 1
+        # Only whitespace may sit between the identifier and the newline
+        newline = text.find("\n", i)
+        if newline == -1:
+            break # No newline left, so no further block can open
+        if newline > i and not text[i:newline].isspace():
+            pos = text.find(_FENCE, pos + 1)
+            continue
+
+        body_start = newline + 1
+        close = text.find(_FENCE, body_start)
+        if close == -1:
+            break # Unterminated block
+        body_end = close
+        while body_end > body_start and text[body_end - 1].isspace():
+            body_end -= 1
+
+        fences.append((pos, body_start, body_end, close + 3))
+        pos = text.find(_FENCE, close + 3)
+    return fences
+
 def extract_code_blocks(response_text: str) -> list[str]:
     """
     Extracts code blocks fenced by triple backticks.
@@ -14,25 +60,10 @@ def extract_code_blocks(response_text: str) -> list[str]:
 
     Returns:
         A list of strings, where each string is a matched code block
-        (including the backticks). Returns an empty list if none found.
+        (including the backticks, so no surrounding whitespace).
+        Returns an empty list if none found.
     """
-    # Pattern for triple-backtick blocks (captures full block in group 0)
-    # Allows optional language identifier and flexible whitespace/newlines
-    triple_tick_pattern = r"```(?:[\w-]+)?\s*?\n(.*?)\n?\s*?```"
-
-    # Use findall to get all non-overlapping matches of the pattern
-    # re.DOTALL makes '.' match newline characters as well
-    matches = re.findall(triple_tick_pattern, response_text, re.DOTALL | re.IGNORECASE)
-
-    # Construct full block matches including backticks for context
-    # Note: findall with groups returns the content *inside* the outer group if groups exist.
-    # We need to re-find the full match for context or use finditer. Let's use finditer.
-
-    full_blocks = []
-    for match_obj in re.finditer(triple_tick_pattern, response_text, re.DOTALL | re.IGNORECASE):
-        full_blocks.append(match_obj.group(0)) # group(0) is the entire match
-
-    return full_blocks
+    return [response_text[start:end] for start, _, _, end in _scan_fences(response_text)]
 
 
 def extract_command_text(code_block: str) -> str:
@@ -40,15 +71,31 @@ def extract_command_text(code_block: str) -> str:
     Removes backticks (triple) and optional language identifier
     from a code block string to get the raw command(s).
     """
-    # Try matching triple backticks first
+    # Fast path: the whole block is a single fence, as produced by extract_code_blocks
+    s = code_block.strip()
+    if len(s) >= 6 and s.startswith(_FENCE) and s.find(_FENCE, 3) == len(s) - 3:
+        nl = s.find("\n", 3)
+        if nl == -1:
+            return s[3:-3].strip() # e.g. ```ls -l```
+        lang = s[3:nl].strip()
+        if not lang or lang.replace("-", "").replace("_", "").isalnum():
+            return s[nl + 1:-3].strip()
+
+    # Otherwise scan for the first fenced block inside the text
+    fences = _scan_fences(code_block)
+    if fences:
+        _, body_start, body_end, _ = fences[0]
+        return code_block[body_start:body_end].strip()
+
+    # Triple backticks without a newline after the opening fence
     # Group 1 captures the content inside the backticks
-    match = re.search(r"```(?:[\w-]+)?\s*?\n?(.*?)\n?\s*?```", code_block, re.DOTALL | re.IGNORECASE)
+    match = _TRIPLE_TICK_CMD_RE.search(code_block)
     if match:
         return match.group(1).strip()
 
     # Fallback: If no triple backticks found, maybe LLM used single backticks?
     # This is less common for multi-line commands but could happen.
-    match_single = re.search(r"`([^`]+)`", code_block)
+    match_single = _SINGLE_TICK_RE.search(code_block)
     if match_single:
          # Be cautious, this might grab unintended inline code snippets
          return match_single.group(1).strip()
@@ -84,8 +131,10 @@ def format_code_blocks_for_display(code_blocks: List[str], raw_response: str) ->
          # output_parts.append(command_text) # Display extracted command
          # output_parts.append("-------------------------")
          # OR just display the raw block as returned by LLM:
-         output_parts.append(f"\n--- Code Block {i+1} ---")
-         output_parts.append(block.strip()) # Show the full block with backticks
+         # Blank line between blocks only, so the result needs no further stripping
+         header = f"--- Code Block {i+1} ---"
+         output_parts.append(header if i == 0 else f"\n{header}")
+         output_parts.append(block) # Show the full block with backticks (already stripped)
          output_parts.append("----------------------")
 
 
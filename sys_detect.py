@@ -3,33 +3,196 @@
 Gathers basic, reliable system information.
 Focuses on OS, architecture, and tool availability.
 """
-import platform
 import os
 import sys
-import json
-import shutil # Used for checking command existence
+import threading
+import functools
+import time
+import types
+from typing import Optional
+# platform, json and tempfile are imported inside the functions that need them,
+# so `import sys_detect` stays cheap.
 
 # No dependency on cmd_run needed for this simplified version
 
+# Tools reported in tools_available (Add/remove as needed)
+_TOOLS_TO_CHECK: "tuple[str, ...]" = ("kubectl", "helm", "curl", "docker", "git")
+
+# Detection results don't change during a process run, so they are gathered once
+_INFO: Optional[dict] = None
+_INFO_LOCK = threading.Lock()
+
+# --- On-Disk Cache ---
+# The OS details (os_info, hostname) are also reused across runs until uname, the Python
+# build or the boot changes (or the TTL expires). environment and tools_available depend on the
+# launching shell's SHELL/TERM/PATH, so they are recomputed on every run and never cached.
+# HELLOWORLD_NO_SYSINFO_CACHE=1 skips the disk cache, HELLOWORLD_REFRESH_SYSINFO=1 rewrites it.
+_DISK_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "helloworld-click-client")
+_DISK_CACHE_PATH = os.path.join(_DISK_CACHE_DIR, "sysinfo.json")
+_DISK_CACHE_TTL = 3600 # seconds
+
+# PATH (and PATHEXT on Windows) split once at import for the _which lookups below
+_PATH_DIRS = tuple(d for d in os.environ.get("PATH", "").split(os.pathsep) if d)
+_PATHEXT = (
+    tuple(ext for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").lower().split(os.pathsep) if ext)
+    if sys.platform == 'win32' else ("",)
+)
+
+@functools.lru_cache(maxsize=64)
+def _which(command_name: str) -> Optional[str]:
+    """
+    Minimal cached replacement for shutil.which: returns the first executable
+    matching command_name on PATH, or None.
+    """
+    names = (command_name,)
+    if sys.platform == 'win32' and not command_name.lower().endswith(_PATHEXT):
+        names = tuple(command_name + ext for ext in _PATHEXT)
+    for directory in _PATH_DIRS:
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.access(path, os.X_OK) and os.path.isfile(path):
+                return path
+    return None
+
 def _check_command_exists(command_name: str) -> bool:
-    """Checks if a command exists using shutil.which (cross-platform)."""
-    return shutil.which(command_name) is not None
+    """Checks if a command exists on PATH (cross-platform, cached)."""
+    return _which(command_name) is not None
+
+@functools.lru_cache(maxsize=1)
+def _cached_os_info() -> types.MappingProxyType:
+    """Core OS details; constant for the process, so computed once (read-only view)."""
+    import platform
+    u = platform.uname() # One uname() call for all fields
+    return types.MappingProxyType({
+        "system": u.system,        # e.g., 'Linux', 'Darwin', 'Windows'
+        "release": u.release,      # e.g., '5.15.0-78-generic', '22.6.0'
+        "version": u.version,      # More detailed version info
+        "machine": u.machine,      # e.g., 'x86_64', 'arm64'
+        "processor": u.processor,    # Often generic, e.g., 'x86_64', 'arm'
+        "python_version": platform.python_version(), # Version of Python interpreter
+    })
+
+@functools.lru_cache(maxsize=1)
+def _cached_hostname() -> str:
+    """Node name (hostname), computed once."""
+    import platform
+    return platform.uname().node # uname() result is cached by the platform module
+
+def _boot_time_key() -> str:
+    """Returns a value that changes on every reboot (empty if unknown on this platform)."""
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/stat') as f:
+                for line in f:
+                    if line.startswith('btime '):
+                        return line.split()[1]
+        except OSError:
+            pass
+        return ""
+    if sys.platform == 'win32':
+        # time.monotonic() is based on GetTickCount64 (time since boot) on Windows
+        return str(int((time.time() - time.monotonic()) // 60))
+    return ""
+
+def _disk_cache_key() -> str:
+    """
+    Cache key: the raw inputs of every cached field (uname and the Python build)
+    plus the boot time. Built without the platform module, so a warm start never
+    runs platform.uname() or its `uname -p` probe.
+    """
+    if hasattr(os, 'uname'):
+        host = "|".join(os.uname()) # sysname, nodename, release, version, machine
+    else:
+        # Windows has no os.uname(); these are plain lookups as well
+        host = f"{os.environ.get('COMPUTERNAME', '')}|{sys.getwindowsversion()}|{os.environ.get('PROCESSOR_IDENTIFIER', '')}"
+    return f"{host}|{sys.version}|{_boot_time_key()}"
+
+def _load_disk_cache(key: str) -> Optional[dict]:
+    """Returns the cached OS details if they match `key` and are within the TTL."""
+    import json
+    try:
+        if time.time() - os.path.getmtime(_DISK_CACHE_PATH) >= _DISK_CACHE_TTL:
+            return None
+        with open(_DISK_CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None # Missing or corrupt cache
+    if not isinstance(data, dict) or data.get("_key") != key:
+        return None
+    info = data.get("info")
+    if not isinstance(info, dict) or "os_info" not in info or "hostname" not in info:
+        return None
+    # Only the OS details are taken from the cache, whatever else the file holds
+    return {"os_info": info["os_info"], "hostname": info["hostname"]}
+
+def _write_disk_cache(key: str, info: dict) -> None:
+    """Writes the OS details cache atomically (best effort)."""
+    import json
+    import tempfile
+    try:
+        os.makedirs(_DISK_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=_DISK_CACHE_DIR,
+                                         suffix=".tmp", delete=False) as tmp:
+            json.dump({"_key": key, "info": info}, tmp, separators=(',', ':'))
+        os.replace(tmp.name, _DISK_CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: Could not write system info cache: {e}", file=sys.stderr)
+
+def _load_or_detect_os_details() -> dict:
+    """Returns the OS details from the disk cache when valid, otherwise detects and caches them."""
+    if os.environ.get("HELLOWORLD_NO_SYSINFO_CACHE") == "1":
+        return _detect_os_details()
+    key = _disk_cache_key()
+    if os.environ.get("HELLOWORLD_REFRESH_SYSINFO") != "1":
+        cached = _load_disk_cache(key)
+        if cached is not None:
+            return cached
+    details = _detect_os_details()
+    _write_disk_cache(key, details)
+    return details
+
+def _load_or_detect_system_info() -> dict:
+    """Combines the (disk-cached) OS details with freshly detected session details."""
+    info = _load_or_detect_os_details()
+    info.update(_detect_session_details(info['os_info']['system']))
+    return info
 
 def get_system_info() -> dict:
-    """Gathers essential cross-platform system details."""
+    """
+    Returns essential cross-platform system details.
+    Detection runs once per process (the OS details are reused from the on-disk
+    cache across runs); later calls return the same (shared) dict, so callers must not mutate it.
+    See invalidate_system_info().
+    """
+    global _INFO
+    if _INFO is None:
+        with _INFO_LOCK:
+            if _INFO is None:
+                _INFO = _load_or_detect_system_info()
+    return _INFO
+
+def invalidate_system_info() -> None:
+    """Drops the memoized system info (and the shared helper caches) so the next call re-runs detection."""
+    global _INFO
+    with _INFO_LOCK:
+        _INFO = None
+        for cached in (_cached_os_info, _cached_hostname, _which, _system_info_json_bytes):
+            cached.cache_clear()
+
+def _detect_os_details() -> dict:
+    """OS and hostname details; stable for the host/kernel/boot, so safe to cache on disk."""
     info = {}
 
-    # --- Core OS Info (platform module) ---
-    info['os_info'] = {
-        "system": platform.system(),        # e.g., 'Linux', 'Darwin', 'Windows'
-        "release": platform.release(),      # e.g., '5.15.0-78-generic', '22.6.0'
-        "version": platform.version(),      # More detailed version info
-        "machine": platform.machine(),      # e.g., 'x86_64', 'arm64'
-        "processor": platform.processor(),    # Often generic, e.g., 'x86_64', 'arm'
-        "python_version": platform.python_version(), # Version of Python interpreter
-    }
+    # --- Core OS Info (platform module, computed once per process) ---
+    info['os_info'] = dict(_cached_os_info()) # Plain dict so it serializes to JSON
     # Add node name (hostname) directly to top level for clarity
-    info['hostname'] = platform.node()
+    info['hostname'] = _cached_hostname()
+
+    return info
+
+def _detect_session_details(system: str) -> dict:
+    """Environment and tool availability; depend on SHELL/TERM/PATH, so never cached on disk."""
+    info = {}
 
     # --- Environment Info (os module) ---
     info['environment'] = {
@@ -37,30 +200,38 @@ def get_system_info() -> dict:
         "terminal": os.environ.get('TERM'), # Terminal type
     }
     # Add Windows command prompt/powershell if shell is not set
-    if not info['environment']['shell'] and platform.system() == 'Windows':
+    if not info['environment']['shell'] and system == 'Windows':
         info['environment']['shell'] = os.environ.get('ComSpec')
 
     # --- Tool Availability ---
-    # List tools to check
-    tools_to_check = ["kubectl", "helm", "curl", "docker", "git"] # Add/remove as needed
     info['tools_available'] = {
-        tool: _check_command_exists(tool) for tool in tools_to_check
+        tool: _check_command_exists(tool) for tool in _TOOLS_TO_CHECK
     }
 
     return info
 
+@functools.lru_cache(maxsize=1)
+def _system_info_json_bytes() -> bytes:
+    """Serializes the memoized system info once (orjson if installed, else compact json)."""
+    try:
+        import orjson
+    except ImportError:
+        import json
+        return json.dumps(get_system_info(), ensure_ascii=False, separators=(',', ':')).encode()
+    return orjson.dumps(get_system_info())
+
 def get_system_info_json() -> str:
-    """Returns the gathered system info as a JSON string."""
+    """Returns the gathered system info as a compact JSON string (serialized once)."""
     try:
-        data = get_system_info()
-        # Use separators for compact JSON, indent=None for no newlines/spaces
-        return json.dumps(data, separators=(',', ':'))
+        return _system_info_json_bytes().decode()
     except Exception as e:
+        import json
         print(f"Error generating system info JSON: {e}", file=sys.stderr)
         # Return minimal error JSON
         return json.dumps({"error": "Failed to gather system information", "details": str(e)})
 
 # Example usage (for testing this module directly)
 if __name__ == '__main__':
+    import json
     print(json.dumps(get_system_info(), indent=2)) # Pretty print for testing
     # print(get_system_info_json()) # Test compact output
\ No newline at end of file